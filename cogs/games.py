@@ -37,6 +37,11 @@ def _hand_value(cards: List[str]) -> int:
         aces -= 1
     return total
 
+# card -> (hard value, ace flag); lets the dealer loop score incrementally
+_CARD_INFO = {
+    f"{r}{s}": (RANK_VALUES[r], 1 if r == "A" else 0) for s in SUITS for r in RANKS
+}
+
 def _is_blackjack(cards: List[str]) -> bool:
     return len(cards) == 2 and _hand_value(cards) == 21
 
@@ -80,9 +85,23 @@ class BlackjackView(discord.ui.View):
         self.deck: List[str] = _new_deck()
         self.player_hand: List[str] = [self.deck.pop(), self.deck.pop()]
         self.dealer_hand: List[str] = [self.deck.pop(), self.deck.pop()]
+        # running dealer total (soft aces already reduced), kept in step with dealer_hand
+        self._d_total = 0
+        self._d_aces = 0
+        for c in self.dealer_hand:
+            v, a = _CARD_INFO[c]
+            self._d_total += v
+            self._d_aces += a
+        while self._d_total > 21 and self._d_aces:
+            self._d_total -= 10
+            self._d_aces -= 1
         self.message: Optional[discord.Message] = None
         self.finished = False
         self.paid = False  # guard against double-settlement
+        self._embed: Optional[discord.Embed] = None  # last embed built for the message
+
+    def _draw(self) -> str:
+        return self.deck.pop()
 
     # Fallback for discord.py variants without View.disable_all_items()
     def _disable_all(self):
@@ -120,7 +139,14 @@ class BlackjackView(discord.ui.View):
             await self.apply_credit(self.player.id, -loss)
             self.paid = True
 
-        embed = self._build_embed(reveal_dealer=True)
+        # Only the dealer reveal, title and footer differ from what is on screen
+        embed = self._embed
+        if embed is None:
+            embed = self._build_embed(reveal_dealer=True)
+        else:
+            embed.title = "🂡 Blackjack — Final"
+            embed.set_field_at(0, name=f"Dealer ({self._d_total})", value=_render_cards(self.dealer_hand), inline=False)
+            embed.set_footer(text="Game over. Start a new /blackjack to play again.")
         embed.add_field(name="Result", value=f"🏳️ **You surrendered.** Lost **{(self.bet + 1)//2}** credits.", inline=False)
         await interaction.response.edit_message(embed=embed, view=self)
 
@@ -161,6 +187,7 @@ class BlackjackView(discord.ui.View):
                 embed.set_footer(text="Click Hit or Stand. Auto-stand in 60s of inactivity.")
         else:
             embed.set_footer(text="Game over. Start a new /blackjack to play again.")
+        self._embed = embed
         return embed
 
     async def _update_embed(self, interaction: Optional[discord.Interaction]):
@@ -174,12 +201,19 @@ class BlackjackView(discord.ui.View):
         self.finished = True
         self._disable_all()
 
-        # Dealer draws to 17+ (stand on soft 17)
-        while _hand_value(self.dealer_hand) < 17:
-            self.dealer_hand.append(self.deck.pop())
+        # Dealer draws to 17+ (stand on soft 17), scoring each card as it lands
+        while self._d_total < 17:
+            c = self._draw()
+            self.dealer_hand.append(c)
+            v, a = _CARD_INFO[c]
+            self._d_total += v
+            self._d_aces += a
+            while self._d_total > 21 and self._d_aces:
+                self._d_total -= 10
+                self._d_aces -= 1
 
         p_total = _hand_value(self.player_hand)
-        d_total = _hand_value(self.dealer_hand)
+        d_total = self._d_total
 
         # Settle bet using your economy
         result_line = ""
@@ -188,7 +222,7 @@ class BlackjackView(discord.ui.View):
                 await self.apply_credit(self.player.id, -self.bet)
                 result_line = f"💥 Bust. Lost **{self.bet}** credits."
             elif d_total > 21 or p_total > d_total:
-                win = int(self.bet * 1.5) if _is_blackjack(self.player_hand) else self.bet
+                win = (self.bet * 3) // 2 if _is_blackjack(self.player_hand) else self.bet
                 await self.apply_credit(self.player.id, win)
                 result_line = f"🏆 You win **{win}** credits."
             elif p_total == d_total:
@@ -1,25 +1,41 @@
 from __future__ import annotations
 import asyncio
+import bisect
+import heapq
+import logging
 import random
 import time
+from collections import OrderedDict
+from contextlib import contextmanager, suppress
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple
+from itertools import accumulate, cycle, islice
+from typing import Dict, List, Optional, Set, Tuple
 
 import discord
 from discord.ext import commands
 from discord import app_commands
+from sqlalchemy import Integer, Numeric, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.pool import NullPool
 
 # Project helpers (available in your repo)
-from utils.db import Balance  # type: ignore
-from utils.common import ensure_user  # type: ignore
+from utils.db import Balance, User  # type: ignore
+
+log = logging.getLogger("utilabot.horserace")
 
 # ------------------------------
 # Config
 # ------------------------------
 MAX_LANES = 10
-HORSE_SET = ["🐎", "🐴", "🏇", "🦄", "🐎", "🐴", "🏇", "🦄", "🐎", "🐴"]
+KNOWN_USERS_MAX = 4096  # cap on the in-process "already has a balance row" cache
+HORSE_SET = ("🐎", "🐴", "🏇", "🦄", "🐎", "🐴", "🏇", "🦄", "🐎", "🐴")
 TRACK_ICON = "—"
 FINISH_FLAG = "🏁"
+# Per-tick step distribution: 0..3 with weights 0.2 / 0.4 / 0.3 / 0.1 (as cumulative weights)
+STEP_CHOICES = (0, 1, 2, 3)
+STEP_CUM_WEIGHTS = (0.2, 0.6, 0.9, 1.0)
+RACE_MAX_TICKS = 60
+RACE_TARGET_SECONDS = 30.0  # long races play back faster than 1 frame/s to fit this
 
 
 # ------------------------------
@@ -27,62 +43,73 @@ FINISH_FLAG = "🏁"
 # ------------------------------
 _AMT_FIELDS = ("amount", "balance", "credits", "coins", "value")
 
-def _pick_amount_attr(bal: Balance) -> Optional[str]:
+def _resolve_amount_column():
+    cols = Balance.__table__.c
     for name in _AMT_FIELDS:
-        if hasattr(bal, name):
-            return name
-    # fallback: first numeric attribute in SQLAlchemy model dict
-    for k, v in vars(bal).items():
-        if k.startswith("_"):
-            continue
-        if isinstance(v, (int, float)):
-            return k
+        if name in cols:
+            return cols[name]
+    # fallback: first numeric non-key column on the table
+    for c in cols:
+        if not c.primary_key and isinstance(c.type, (Integer, Numeric)):
+            return c
     return None
 
+# The model doesn't change at runtime, so resolve the field once at import.
+_AMT_COL = _resolve_amount_column()
+_AMT: Optional[str] = _AMT_COL.key if _AMT_COL is not None else None
+
 def _get_balance(session, user_id: int) -> int:
     bal = session.query(Balance).filter_by(user_id=user_id).one_or_none()
-    if not bal:
+    if not bal or not _AMT:
         return 0
-    attr = _pick_amount_attr(bal)
-    return int(getattr(bal, attr)) if attr else 0
+    return getattr(bal, _AMT) or 0
 
-def _set_balance(session, user_id: int, value: int) -> int:
-    bal = session.query(Balance).filter_by(user_id=user_id).one_or_none()
-    if not bal:
-        bal = Balance(user_id=user_id)
-        session.add(bal)
-        session.flush()
-    attr = _pick_amount_attr(bal)
-    if not attr:
+def _amount_column():
+    if _AMT_COL is None:
         raise RuntimeError("Balance model has no numeric amount field I can detect.")
-    setattr(bal, attr, int(value))
-    session.commit()
-    return int(getattr(bal, attr))
-
-def _add_balance(session, user_id: int, delta: int) -> int:
-    current = _get_balance(session, user_id)
-    return _set_balance(session, user_id, current + int(delta))
-
-def _can_afford(session, user_id: int, amount: int) -> bool:
-    return _get_balance(session, user_id) >= amount
+    return _AMT_COL
+
+def _ensure_balance_row(session, user_id: int) -> None:
+    """Create the user/balance rows if missing (no-op for returning users)."""
+    session.execute(sqlite_insert(User).values(id=user_id).on_conflict_do_nothing())
+    session.execute(sqlite_insert(Balance).values(user_id=user_id).on_conflict_do_nothing())
+
+def _debit_if_affordable(session, user_id: int, amount: int) -> bool:
+    """Atomically debit `amount` if the balance covers it. False if it doesn't. Caller commits."""
+    col = _amount_column()
+    result = session.execute(
+        update(Balance)
+        .where(Balance.user_id == user_id, col >= amount)
+        .values({col.key: col - amount})
+    )
+    return result.rowcount == 1
+
+def _bulk_credit(session, user_ids: List[int], amount: int) -> None:
+    """Credit the same amount to every user in one UPDATE. Caller commits.
+
+    Only for users whose rows exist, i.e. who were debited a bet earlier.
+    """
+    if not user_ids:
+        return
+    col = _amount_column()
+    session.execute(
+        update(Balance).where(Balance.user_id.in_(user_ids)).values({col.key: col + amount})
+    )
 
 
 # ------------------------------
 # Game data structures
 # ------------------------------
 
-@dataclass
+@dataclass(slots=True)
 class Racer:
-    user_id: Optional[int]   # None for AI
-    display: str
+    """A human racer: identity and bet. Per-lane race state lives in RaceState's flat lists."""
+    user_id: int
     horse: str
     bet: int
-    lane: int = 0
-    progress: int = 0
-    is_ai: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class RaceState:
     guild_id: int
     channel_id: int
@@ -92,83 +119,124 @@ class RaceState:
     track_len: int
     started: bool = False
     message_id: Optional[int] = None
-    racers: Dict[str, Racer] = field(default_factory=dict)  # key: lane id str or user id str
+    human_racers: Dict[int, Racer] = field(default_factory=dict)  # key: user id
+    ai_count: int = 0  # AI lanes, placed after the humans
+    progress: List[int] = field(default_factory=list)  # per lane during the race: humans first, then AI
     join_view: Optional[discord.ui.View] = None
-    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    dirty: asyncio.Event = field(default_factory=asyncio.Event)  # set on join/leave; the lobby is redrawn
+    start_event: asyncio.Event = field(default_factory=asyncio.Event)  # host clicked Start Now
+    cancel_event: asyncio.Event = field(default_factory=asyncio.Event)  # host clicked Cancel
+    pending: Set[int] = field(default_factory=set)  # user ids holding a lane while their debit runs
     cancelled: bool = False
     resolved: bool = False
-
-    @property
-    def human_racers(self) -> List[Racer]:
-        return [r for r in self.racers.values() if not r.is_ai]
+    settled: bool = False  # bets refunded or paid out
+    lobby_deadline: float = 0.0  # monotonic time the lobby closes; set just before the lobby is posted
+    lobby_ends_at: int = 0  # the same moment as a unix timestamp, for Discord's <t:…:R> countdown
+    _pot: int = 0  # humans' bets, kept in step with human_racers by join/leave
+    _last_lobby_hash: Optional[int] = field(default=None, repr=False)
+    _lobby_header: str = field(default="", repr=False)  # static first line of the lobby description
+    _lobby_embed: Optional[discord.Embed] = field(default=None, repr=False)  # built once, then mutated
+    _racers_field: Optional[str] = field(default=None, repr=False)  # lobby racer list; None after join/leave
+    _track_dashes: str = field(default="", repr=False)  # empty track, sliced around each horse
+    _lanes: List[str] = field(default_factory=list, repr=False)  # rendered row per lane
+    _horses: List[str] = field(default_factory=list, repr=False)  # horse per lane
+    _racers: List[Racer] = field(default_factory=list, repr=False)  # human racer per lane, in lane order
+    _race_embed: Optional[discord.Embed] = field(default=None, repr=False)  # built on the first frame, then mutated
+    _last_track_hash: Optional[Tuple[int, ...]] = field(default=None, repr=False)  # progress last sent to Discord
+    _labels: List[str] = field(default_factory=list, repr=False)  # leader label per lane
+    _leaders_cache: Tuple[Tuple[int, ...], str] = field(default=((), ""), repr=False)  # (lanes, joined text)
+
+    def __post_init__(self) -> None:
+        self._lobby_header = f"Bet per racer: **{self.bet:,}** credits\n"
+        self._track_dashes = TRACK_ICON * self.track_len
 
     @property
     def pot(self) -> int:
         # pot is humans' bets only
-        return sum(r.bet for r in self.human_racers)
-
-    def render_lobby_embed(self, remaining: int) -> discord.Embed:
-        e = discord.Embed(
-            title="🏇 Horse Race — Lobby",
-            description=(
-                f"Bet per racer: **{self.bet:,}** credits\n"
-                f"Pot so far (humans): **{self.pot:,}**\n"
-                f"Time left to join: **{remaining}s**"
-            ),
-            color=discord.Color.gold(),
+        return self._pot
+
+    def render_lobby_embed(self) -> discord.Embed:
+        e = self._lobby_embed
+        # join/leave clear _racers_field; the pot only moves with them, so otherwise nothing changed
+        if e is not None and self._racers_field is not None:
+            return e
+        if e is None:
+            e = discord.Embed(title="🏇 Horse Race — Lobby", color=discord.Color.gold())
+            e.add_field(name="Human Racers", value="(none yet)", inline=False)
+            e.set_footer(text="Click Join to enter, Leave to withdraw. Host can start early or cancel.")
+            self._lobby_embed = e
+        e.description = (
+            f"{self._lobby_header}"
+            f"Pot so far (humans): **{self.pot:,}**\n"
+            f"Race starts <t:{self.lobby_ends_at}:R>"  # Discord counts down client-side
         )
-        if self.racers:
-            lines = []
-            for r in self.human_racers:
-                lines.append(f"{r.horse} **{r.display}** — bet **{r.bet:,}**")
-            if not lines:
-                lines.append("_No human racers yet_")
-            e.add_field(name="Human Racers", value="\n".join(lines), inline=False)
+        if self.human_racers:
+            self._racers_field = "\n".join(
+                f"{r.horse} <@{r.user_id}> — bet **{r.bet:,}**" for r in self.human_racers.values()
+            )
         else:
-            e.add_field(name="Human Racers", value="(none yet)", inline=False)
-        e.set_footer(text="Click Join to enter, Leave to withdraw. Host can start early or cancel.")
+            self._racers_field = "(none yet)"
+        e.set_field_at(0, name="Human Racers", value=self._racers_field, inline=False)
         return e
 
-    def _render_lane(self, r: Racer) -> str:
-        # Example: ——🐎——————🏁  (horse itself moves across track)
-        progress = max(0, min(self.track_len, r.progress))
-        left = TRACK_ICON * progress
-        right = TRACK_ICON * (self.track_len - progress)
-        return f"{left}{r.horse}{right}{FINISH_FLAG}"
-
-    def render_track(self) -> Tuple[str, List[str]]:
-        lanes: List[str] = []
-        order: List[Tuple[int, str]] = []
-        # Stable order by lane index
-        for idx, r in enumerate(self.racers.values()):
-            lane = self._render_lane(r)
-            lanes.append(lane)
-            # for leaders, key them by 'H:<id>' for humans; 'A:idx' for ai
-            key = f"H:{r.user_id}" if r.user_id is not None else f"A:{idx}"
-            order.append((r.progress, key))
-        # order for display (leaders top 3)
-        leaders_keys = [k for _p, k in sorted(order, key=lambda x: -x[0])]
-        return "\n".join(lanes), leaders_keys
-
-    def render_race_embed(self, tick: int) -> discord.Embed:
-        track_str, leaders = self.render_track()
-        # Build human-only mentions in leaders if any
-        leader_mentions: List[str] = []
-        for k in leaders[:3]:
-            if k.startswith("H:"):
-                uid = int(k.split(":", 1)[1])
-                leader_mentions.append(f"<@{uid}>")
-            else:
-                leader_mentions.append("CPU")
-        e = discord.Embed(
-            title=f"🏇 Horse Race — Lap {tick}",
-            description=f"First to {self.track_len} wins. Human Pot: **{self.pot:,}**",
-            color=discord.Color.blurple(),
-        )
-        e.add_field(name="Track", value=f"```\n{track_str}\n```", inline=False)
-        if leader_mentions:
-            e.add_field(name="Leaders", value=", ".join(leader_mentions), inline=False)
-        e.set_footer(text="Who will cross the flag first?!")
+    def reset_lanes(self) -> None:
+        """Put every racer on the start line and lay out one track row per lane."""
+        # Example row: 🐎———————🏁  (horse moves across the track)
+        self._racers = list(self.human_racers.values())
+        # AI lanes continue the human lanes' walk through HORSE_SET; take them in one slice
+        h = len(self._racers)
+        self._horses = [r.horse for r in self._racers]
+        self._horses += islice(cycle(HORSE_SET), h, h + self.ai_count)
+        self.progress = [0] * len(self._horses)
+        self._lanes = [self._lane(horse, 0) for horse in self._horses]
+        # participants are fixed from here on, so format leader labels once
+        self._labels = [f"<@{r.user_id}>" for r in self._racers] + ["CPU"] * self.ai_count
+
+    def _lane(self, horse: str, progress: int) -> str:
+        d = self._track_dashes
+        return f"{d[:progress]}{horse}{d[progress:]}{FINISH_FLAG}"
+
+    def set_frame(self, frame: Tuple[int, ...]) -> None:
+        """Move every lane to the frame's progress, re-rendering only the lanes that moved."""
+        # frames come from _simulate, already within 0..track_len
+        progress = self.progress
+        for lane, p in enumerate(frame):
+            if p != progress[lane]:
+                progress[lane] = p
+                self._lanes[lane] = self._lane(self._horses[lane], p)
+
+    def render_track(self) -> Tuple[str, List[int], bool, List[Racer]]:
+        """Track text, top-3 leader lanes, whether anyone finished, and the human winners."""
+        progress = self.progress
+        top = max(progress)
+        # leaders for display: top 3 only, ties keep lane order
+        leaders = heapq.nlargest(3, range(len(progress)), key=progress.__getitem__)
+        finished = top >= self.track_len
+        # winners are every human level with the leader once the leader has crossed
+        winners = [r for r, p in zip(self._racers, progress) if p == top] if finished else []
+        # lanes are kept rendered by set_frame(), in lane order
+        return "\n".join(self._lanes), leaders, finished, winners
+
+    def render_race_embed(self, tick: int, track: Optional[Tuple[str, List[int], bool, List[Racer]]] = None) -> discord.Embed:
+        track_str, leaders, _finished, _winners = track if track is not None else self.render_track()
+        lanes = tuple(leaders[:3])
+        if lanes != self._leaders_cache[0]:
+            self._leaders_cache = (lanes, ", ".join(self._labels[i] for i in lanes))
+        leader_text = self._leaders_cache[1] or "—"
+        e = self._race_embed
+        if e is None:
+            # description and footer never change during a race; build them once
+            e = discord.Embed(
+                description=f"First to {self.track_len} wins. Human Pot: **{self.pot:,}**",
+                color=discord.Color.blurple(),
+            )
+            e.add_field(name="Track", value="", inline=False)
+            e.add_field(name="Leaders", value="", inline=False)
+            e.set_footer(text="Who will cross the flag first?!")
+            self._race_embed = e
+        e.title = f"🏇 Horse Race — Lap {tick}"
+        e.set_field_at(0, name="Track", value=f"```\n{track_str}\n```", inline=False)
+        e.set_field_at(1, name="Leaders", value=leader_text, inline=False)
         return e
 
 
@@ -185,82 +253,89 @@ class LobbyView(discord.ui.View):
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
         return interaction.channel and interaction.channel.id == self.state.channel_id
 
+    # Every callback ACKs first: the DB round-trip can outlast Discord's 3s window.
+    # The lobby can start, be cancelled or be refunded while that defer is in flight, so
+    # each callback re-checks started/cancelled/settled after it before touching state.
+
     @discord.ui.button(label="Join", style=discord.ButtonStyle.success, emoji="✅")
     async def join(self, interaction: discord.Interaction, button: discord.ui.Button):
-        async with self.state.lock:
-            if self.state.started:
-                return await interaction.response.send_message("Race already started.", ephemeral=True)
-            uid = interaction.user.id
-            if any((r.user_id == uid) for r in self.state.human_racers):
-                return await interaction.response.send_message("You're already in!", ephemeral=True)
-            if len(self.state.human_racers) >= MAX_LANES:
-                return await interaction.response.send_message("All lanes are full.", ephemeral=True)
-
-            # Balance check & debit
-            session = self.cog.bot.SessionLocal()
-            try:
-                ensure_user(session, uid)
-                if not _can_afford(session, uid, self.state.bet):
-                    return await interaction.response.send_message(
-                        f"You need **{self.state.bet:,}** credits to join.", ephemeral=True
-                    )
-                _add_balance(session, uid, -self.state.bet)
-            finally:
-                session.close()
-
-            racer = Racer(
-                user_id=uid,
-                display=str(interaction.user.display_name),
-                horse=HORSE_SET[len(self.state.racers) % len(HORSE_SET)],
-                bet=self.state.bet,
-                is_ai=False,
+        await interaction.response.defer()
+        uid = interaction.user.id
+        state = self.state
+        # Reserve a lane; the DB round-trip happens after
+        if state.started:
+            return await interaction.followup.send("Race already started.", ephemeral=True)
+        if uid in state.human_racers or uid in state.pending:
+            return await interaction.followup.send("You're already in!", ephemeral=True)
+        if len(state.human_racers) + len(state.pending) >= MAX_LANES:
+            return await interaction.followup.send("All lanes are full.", ephemeral=True)
+        state.pending.add(uid)
+
+        # Balance check & debit
+        paid = False
+        try:
+            known = self.cog._is_known_user(uid)
+            paid = await self.cog._run_db(self.cog._debit_sync, uid, state.bet, ensure=not known)
+            self.cog._remember_user(uid)
+        finally:
+            state.pending.discard(uid)
+            late = state.started or state.cancelled or state.resolved
+            if paid and not late:
+                state._racers_field = None
+                state.human_racers[uid] = Racer(
+                    user_id=uid,
+                    horse=HORSE_SET[len(state.human_racers) % len(HORSE_SET)],
+                    bet=state.bet,
+                )
+                state._pot += state.bet
+
+        if not paid:
+            return await interaction.followup.send(
+                f"You need **{state.bet:,}** credits to join.", ephemeral=True
             )
-            self.state.racers[f"H:{uid}"] = racer
-            remaining = max(0, int(self.timeout or 0))
-            emb = self.state.render_lobby_embed(remaining)
-            await interaction.response.edit_message(embed=emb, view=self)
+        if late:
+            # lobby closed while we were debiting; give the bet back
+            await self.cog._run_db(self.cog._credit_sync, [uid], state.bet)
+            return await interaction.followup.send("Race already started.", ephemeral=True)
+
+        state.dirty.set()  # _refresh_lobby redraws the embed
 
     @discord.ui.button(label="Leave", style=discord.ButtonStyle.secondary, emoji="↩️")
     async def leave(self, interaction: discord.Interaction, button: discord.ui.Button):
-        async with self.state.lock:
-            uid = interaction.user.id
-            key = f"H:{uid}"
-            if key not in self.state.racers:
-                return await interaction.response.send_message("You're not in.", ephemeral=True)
-            if self.state.started:
-                return await interaction.response.send_message("Too late—race already started!", ephemeral=True)
-
-            bet = self.state.racers[key].bet
-            del self.state.racers[key]
-
-            # Refund
-            session = self.cog.bot.SessionLocal()
-            try:
-                _add_balance(session, uid, bet)
-            finally:
-                session.close()
-
-            remaining = max(0, int(self.timeout or 0))
-            emb = self.state.render_lobby_embed(remaining)
-            await interaction.response.edit_message(embed=emb, view=self)
+        await interaction.response.defer()
+        uid = interaction.user.id
+        state = self.state
+        # a Cancel that landed during the defer has already refunded everyone
+        if state.started or state.cancelled or state.settled:
+            return await interaction.followup.send("Too late—race already started!", ephemeral=True)
+        if uid not in state.human_racers:
+            return await interaction.followup.send("You're not in.", ephemeral=True)
+        bet = state.human_racers.pop(uid).bet
+        state._pot -= bet
+        state._racers_field = None
+
+        # Refund
+        await self.cog._run_db(self.cog._credit_sync, [uid], bet)
+
+        state.dirty.set()  # _refresh_lobby redraws the embed
 
     @discord.ui.button(label="Start Now", style=discord.ButtonStyle.primary, emoji="🚦")
     async def start_now(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if interaction.user.id != self.state.author_id:
-            return await interaction.response.send_message("Only the host can start early.", ephemeral=True)
-        async with self.state.lock:
-            self.state.started = True
         await interaction.response.defer()
-        self.stop()
+        if interaction.user.id != self.state.author_id:
+            return await interaction.followup.send("Only the host can start early.", ephemeral=True)
+        if not (self.state.started or self.state.cancelled):
+            self.state.start_event.set()
 
     @discord.ui.button(label="Cancel", style=discord.ButtonStyle.danger, emoji="🛑")
     async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if interaction.user.id != self.state.author_id:
-            return await interaction.response.send_message("Only the host can cancel.", ephemeral=True)
-        async with self.state.lock:
-            self.state.cancelled = True
         await interaction.response.defer()
-        self.stop()
+        if interaction.user.id != self.state.author_id:
+            return await interaction.followup.send("Only the host can cancel.", ephemeral=True)
+        if self.state.started:
+            return await interaction.followup.send("Race already started.", ephemeral=True)
+        self.state.cancelled = True
+        self.state.cancel_event.set()
 
 
 # ------------------------------
@@ -272,7 +347,30 @@ class HorseRace(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        # bound once; every DB operation below opens exactly one session from it
+        self.SessionLocal = bot.SessionLocal
+        self._check_pool()
         self.active_by_channel: Dict[int, RaceState] = {}
+        # users known to have user/balance rows (LRU), so repeat joiners skip the upsert
+        self._known_users: "OrderedDict[int, None]" = OrderedDict()
+
+    def _check_pool(self) -> None:
+        # Every join/leave/refund checks out a connection; without pooling each one reconnects.
+        engine = getattr(self.SessionLocal, "kw", {}).get("bind")
+        if isinstance(getattr(engine, "pool", None), NullPool):
+            log.warning("SessionLocal is bound to an engine using NullPool; horserace DB calls will reconnect every time")
+
+    def _is_known_user(self, user_id: int) -> bool:
+        if user_id in self._known_users:
+            self._known_users.move_to_end(user_id)
+            return True
+        return False
+
+    def _remember_user(self, user_id: int) -> None:
+        self._known_users[user_id] = None
+        self._known_users.move_to_end(user_id)
+        if len(self._known_users) > KNOWN_USERS_MAX:
+            self._known_users.popitem(last=False)
 
     def _guard_channel_free(self, channel_id: int) -> bool:
         state = self.active_by_channel.get(channel_id)
@@ -291,10 +389,9 @@ class HorseRace(commands.Cog):
             return await interaction.response.send_message("Run this in a server channel.", ephemeral=True)
 
         channel_id = interaction.channel.id
+        # check-and-register has no await in between, so it is atomic on the event loop
         if not self._guard_channel_free(channel_id):
             return await interaction.response.send_message("There is already a race in this channel. Please wait.", ephemeral=True)
-
-        # init state
         state = RaceState(
             guild_id=interaction.guild_id or 0,
             channel_id=channel_id,
@@ -305,140 +402,219 @@ class HorseRace(commands.Cog):
         )
         self.active_by_channel[channel_id] = state
 
+        try:
+            await self._run_race(interaction, state)
+        finally:
+            # also covers errors (e.g. the message was deleted): never strand a race or its bets
+            await self._finish(state)
+
+    async def _run_race(self, interaction: discord.Interaction, state: RaceState) -> None:
+        lobby_seconds = state.lobby_seconds
+
         # Post lobby
         view = LobbyView(self, state, timeout=float(lobby_seconds))
         state.join_view = view
-        emb = state.render_lobby_embed(remaining=lobby_seconds)
-        await interaction.response.send_message(embed=emb, view=view)
+        state.lobby_deadline = time.monotonic() + lobby_seconds
+        state.lobby_ends_at = int(time.time()) + lobby_seconds
+        emb = state.render_lobby_embed()
+        # racers are shown as <@id> mentions; Discord renders the names, nobody gets pinged
+        await interaction.response.send_message(
+            embed=emb, view=view, allowed_mentions=discord.AllowedMentions(users=False)
+        )
         msg = await interaction.original_response()
         state.message_id = msg.id
 
-        # Countdown updates
-        started_at = time.monotonic()
-        while not view.is_finished() and not state.cancelled:
-            await asyncio.sleep(1)
-            elapsed = int(time.monotonic() - started_at)
-            remaining = max(0, lobby_seconds - elapsed)
-            try:
-                await msg.edit(embed=state.render_lobby_embed(remaining), view=view)
-            except discord.HTTPException:
-                pass
-            if remaining <= 0:
-                view.stop()
+        # Wait for the host or the clock to close the lobby; a side task redraws it on join/leave
+        ticker = asyncio.create_task(self._refresh_lobby(msg, state, view))
+        waiters = [asyncio.create_task(state.start_event.wait()), asyncio.create_task(state.cancel_event.wait())]
+        try:
+            timeout = max(0.0, state.lobby_deadline - time.monotonic())
+            await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for t in waiters:
+                t.cancel()
+            ticker.cancel()
+            # let a lobby redraw already in flight finish so it can't land after the final edit
+            with suppress(asyncio.CancelledError):
+                await ticker
+        view.stop()
+
+        # Decide the outcome in one step (no await) so a late Cancel can't land on a started race
+        if not state.cancelled:
+            state.started = True
 
         # Lobby ended
         if state.cancelled:
             await self._refund_all(state)
             await msg.edit(content="Race cancelled. Bets refunded.", embed=None, view=None)
-            self._finish(channel_id)
             return
 
-        async with state.lock:
-            state.started = True
-
         human_count = len(state.human_racers)
         if human_count == 0:
             await msg.edit(content="No human racers joined. Bets (if any) refunded.", embed=None, view=None)
             await self._refund_all(state)
-            self._finish(channel_id)
             return
 
         # Fill with AI up to MAX_LANES
         ai_needed = max(0, min(MAX_LANES, MAX_LANES - human_count))
-        for i in range(ai_needed):
-            name = f"CPU {i+1}"
-            racer = Racer(
-                user_id=None,
-                display=name,
-                horse=HORSE_SET[(len(state.racers)) % len(HORSE_SET)],
-                bet=0,
-                is_ai=True,
-            )
-            state.racers[f"A:{i}"] = racer
+        state.ai_count = ai_needed
 
         # Start the race
         await msg.edit(content="Race starting! (AI fill active)", embed=None, view=None)
-        await self._animate_race(msg, state)
 
-        # Determine winners
-        max_prog = max(r.progress for r in state.racers.values())
-        winners = [r for r in state.racers.values() if r.progress >= state.track_len and r.progress == max_prog]
-
-        human_winners = [r for r in winners if not r.is_ai]
+        human_winners, final_embed = await self._animate_race(msg, state)
         if human_winners:
-            paid = await self._payout(state, [r.user_id for r in human_winners if r.user_id is not None])
-            mentions = ", ".join(f"<@{r.user_id}>" for r in human_winners if r.user_id is not None)
+            paid = await self._payout(state, [r.user_id for r in human_winners])
+            share = next(iter(paid.values()), 0)  # what was actually credited
+            mentions = ", ".join(f"<@{r.user_id}>" for r in human_winners)
             if len(human_winners) == 1:
-                summary = f"{mentions} wins **{state.pot:,}** credits!"
+                summary = f"{mentions} wins **{share:,}** credits!"
             else:
-                share = state.pot // len(human_winners)
                 summary = f"{mentions} tie and each receive **{share:,}** credits!"
         else:
+            state.settled = True  # house keeps the pot
             summary = "Only AI crossed the line first. House keeps the pot."
 
-        await msg.edit(content=f"🏁 Race finished! {summary}", view=None)
-        self._finish(channel_id)
+        await msg.edit(content=f"🏁 Race finished! {summary}", embed=final_embed, view=None)
 
     # --------------- Internals ---------------
 
-    def _finish(self, channel_id: int) -> None:
-        state = self.active_by_channel.get(channel_id)
-        if state:
-            state.resolved = True
-        self.active_by_channel.pop(channel_id, None)
+    async def _refresh_lobby(self, msg: discord.Message, state: RaceState, view: LobbyView) -> None:
+        """Redraw the lobby when the racer list changes; the countdown itself needs no edits."""
+        while True:
+            await state.dirty.wait()
+            state.dirty.clear()
+            lobby_hash = hash(tuple(state.human_racers))
+            if lobby_hash == state._last_lobby_hash:
+                continue
+            state._last_lobby_hash = lobby_hash
+            try:
+                await msg.edit(embed=state.render_lobby_embed(), view=view)
+            except discord.HTTPException:
+                pass
+
+    async def _finish(self, state: RaceState) -> None:
+        if state.resolved:
+            return
+        state.resolved = True
+        if self.active_by_channel.get(state.channel_id) is state:
+            del self.active_by_channel[state.channel_id]
+        if not state.settled:
+            await self._refund_all(state)
+
+    async def _run_db(self, fn, *args, **kwargs):
+        """Run a blocking DB worker off the event loop so gateway heartbeats and other races keep going."""
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+    @contextmanager
+    def _session(self):
+        """One session and one transaction for a whole logical operation; commits on success."""
+        with self.SessionLocal() as session, session.begin():
+            yield session
+
+    # Sync DB work: one _session() per operation, run via _run_db
+    def _debit_sync(self, user_id: int, amount: int, *, ensure: bool = True) -> bool:
+        with self._session() as session:
+            if ensure:
+                _ensure_balance_row(session, user_id)
+            return _debit_if_affordable(session, user_id, amount)
+
+    def _credit_sync(self, user_ids: List[int], amount: int) -> None:
+        with self._session() as session:
+            _bulk_credit(session, user_ids, amount)
 
     async def _refund_all(self, state: RaceState):
-        session = self.bot.SessionLocal()
-        try:
-            for r in state.human_racers:
-                _add_balance(session, r.user_id, r.bet)  # type: ignore[arg-type]
-        finally:
-            session.close()
+        if state.settled:
+            return
+        state.settled = True
+        if not state.human_racers or state.bet <= 0:
+            return  # nothing was debited, so don't check out a connection for a no-op
+        # every racer paid the lobby's fixed bet, so one grouped credit covers them all;
+        # their rows exist because the debit succeeded, so the whole settlement is one UPDATE
+        await self._run_db(self._credit_sync, list(state.human_racers), state.bet)
 
     async def _payout(self, state: RaceState, winner_ids: List[int]) -> Dict[int, int]:
-        if not winner_ids:
+        if not winner_ids or state.settled:
             return {}
+        state.settled = True
         total = state.pot
         share = total // len(winner_ids)
-        session = self.bot.SessionLocal()
+        if share <= 0:
+            return {}
+        await self._run_db(self._credit_sync, winner_ids, share)
+        return {uid: share for uid in winner_ids}
+
+    def _simulate(self, state: RaceState) -> List[Tuple[int, ...]]:
+        """Roll the whole race up front: one progress vector per tick, ending at the first finish."""
+        n = len(state.human_racers) + state.ai_count
+        tl = state.track_len
+        # AI and humans share the same distribution for fairness; roll every tick in one call
+        rolls = random.choices(STEP_CHOICES, cum_weights=STEP_CUM_WEIGHTS, k=n * RACE_MAX_TICKS)
+        # each lane's progress is a running sum of its own rolls, computed in C per lane
+        lanes = [list(accumulate(rolls[i::n])) for i in range(n)]
+        # lanes never go backwards, so the first tick anyone reaches the flag is a bisect per lane
+        end = min(bisect.bisect_left(lane, tl) for lane in lanes)
+        end = min(end, RACE_MAX_TICKS - 1)
+        schedule = list(zip(*(lane[:end + 1] for lane in lanes)))
+        # only the finishing tick can overshoot the flag
+        schedule[-1] = tuple(p if p < tl else tl for p in schedule[-1])
+        return schedule
+
+    async def _safe_edit(self, msg: discord.Message, **kwargs) -> None:
         try:
-            paid: Dict[int, int] = {}
-            for uid in winner_ids:
-                _add_balance(session, uid, share)
-                paid[uid] = share
-            return paid
-        finally:
-            session.close()
+            await msg.edit(**kwargs)
+        except discord.HTTPException:
+            pass
 
-    async def _animate_race(self, msg: discord.Message, state: RaceState) -> discord.Message:
-        # Initialize
-        for i, r in enumerate(state.racers.values()):
-            r.lane = i
-            r.progress = 0
+    async def _animate_race(self, msg: discord.Message, state: RaceState) -> Tuple[List[Racer], discord.Embed]:
+        """Play the race back on the message; return the human winners (empty if an AI won) and the last frame.
 
-        tick = 1
-        while True:
-            await asyncio.sleep(1.0)
-            # advance each racer
-            for r in state.racers.values():
-                # AI and humans share same distribution for fairness; tweak later if desired
-                step = random.choices([0,1,2,3], weights=[0.2, 0.4, 0.3, 0.1])[0]
-                r.progress = min(state.track_len, r.progress + step)
-
-            emb = state.render_race_embed(tick)
-            try:
-                await msg.edit(embed=emb)
-            except discord.HTTPException:
-                pass
-
-            # finish?
-            finished = [r for r in state.racers.values() if r.progress >= state.track_len]
-            if finished:
-                return msg
+        The last frame is not sent here: the caller edits it in together with the result.
+        """
+        # Initialize
+        state.reset_lanes()
+
+        schedule = self._simulate(state)
+        delay = min(1.0, RACE_TARGET_SECONDS / len(schedule))
+        state._last_track_hash = None
+
+        # Coalescing writer: the race loop never waits on Discord. Frames that arrive while an
+        # edit is in flight collapse into one, and the writer always sends the newest state.
+        wake = asyncio.Event()
+        latest_tick = 0
+        done = False
+
+        async def writer() -> None:
+            while True:
+                await wake.wait()
+                wake.clear()
+                if done:
+                    return
+                await self._safe_edit(msg, embed=state.render_race_embed(latest_tick, state.render_track()))
+
+        writer_task = asyncio.create_task(writer())
+        try:
+            for tick, frame in enumerate(schedule, start=1):
+                await asyncio.sleep(delay)
+                state.set_frame(frame)
+                if tick == len(schedule):
+                    break
+
+                # nobody moved since the last frame: nothing new to show
+                fingerprint = tuple(frame)
+                if fingerprint == state._last_track_hash:
+                    continue
+                state._last_track_hash = fingerprint
+                latest_tick = tick
+                wake.set()
+        finally:
+            # let an in-flight edit land so the result edit can't be overtaken by an older frame
+            done = True
+            wake.set()
+            await writer_task
 
-            tick += 1
-            if tick > 60:
-                return msg
+        track = state.render_track()
+        return track[3], state.render_race_embed(len(schedule), track)
 
 
 async def setup(bot: commands.Bot):
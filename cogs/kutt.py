@@ -1,12 +1,37 @@
 # cogs/kutt.py
 from __future__ import annotations
+import asyncio
+import json
+import logging
 import os
+import re
+import time
+from collections import OrderedDict
 import aiohttp
 import discord
 from discord.ext import commands
 from discord import app_commands
 from urllib.parse import urlparse
 
+# Faster JSON when orjson is installed; stdlib otherwise
+try:
+    import orjson
+    _json_loads = orjson.loads
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+except Exception:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
+# aiodns resolves without a thread hop; aiohttp's threaded resolver is the fallback
+try:
+    import aiodns  # noqa: F401
+    _RESOLVER = aiohttp.AsyncResolver
+except Exception:
+    _RESOLVER = None
+
+log = logging.getLogger("utilabot.kutt")
+
 # ---- ENV (compatible with your old bot) ----
 KUTT_HOST = (os.getenv("KUTT_HOST") or os.getenv("KUTT_BASE_URL") or "https://kutt.it").rstrip("/")
 KUTT_API  = os.getenv("KUTT_API") or os.getenv("KUTT_API_KEY")
@@ -15,13 +40,28 @@ KUTT_DOMAIN = os.getenv("KUTT_DOMAIN") or os.getenv("KUTT_LINK_DOMAIN")
 # Only send the 'domain' field to the API if explicitly forced.
 KUTT_FORCE_DOMAIN = os.getenv("KUTT_FORCE_DOMAIN", "false").lower() in ("1", "true", "yes")
 
-def _scheme(host: str) -> str:
-    p = urlparse(host if "://" in host else f"http://{host}")
-    return p.scheme or "http"
+# KUTT_HOST / KUTT_DOMAIN never change at runtime: parse them once.
+_KUTT_PARTS = urlparse(KUTT_HOST if "://" in KUTT_HOST else f"http://{KUTT_HOST}")
+_KUTT_SCHEME = _KUTT_PARTS.scheme or "http"
+_KUTT_NETLOC = _KUTT_PARTS.netloc or KUTT_HOST
+_KUTT_DISPLAY_DOMAIN = (KUTT_DOMAIN or "").replace("http://", "").replace("https://", "").strip().strip("/")
+# short links are "<prefix><address>"; the display domain (if any) wins over the API host
+_KUTT_DISPLAY_PREFIX = f"{_KUTT_SCHEME}://{_KUTT_DISPLAY_DOMAIN}/" if _KUTT_DISPLAY_DOMAIN else ""
+_KUTT_HOST_PREFIX = f"{_KUTT_SCHEME}://{_KUTT_NETLOC}/"
+_KUTT_HEADERS = {"X-API-KEY": KUTT_API or "", "Accept": "application/json"}
+_LINK_ENDPOINTS = ("/api/v3/links", "/api/v2/links")
+# any of these in a response means Kutt handed back a link object
+_LINK_KEYS = frozenset({"address", "id", "link", "shortUrl", "target"})
+# session-wide default; a short connect budget fails fast when Kutt is unreachable
+_KUTT_TIMEOUT = aiohttp.ClientTimeout(total=20, connect=5, sock_connect=5, sock_read=15)
+# Kutt answers with a few hundred bytes; don't buffer a proxy's multi-MB error page
+_MAX_BODY = 64 * 1024
 
-def _netloc(host: str) -> str:
-    p = urlparse(host if "://" in host else f"http://{host}")
-    return p.netloc or host
+# Recently shortened links, so a re-pasted URL doesn't go back to Kutt
+SHORTEN_CACHE_MAX = 1024
+SHORTEN_CACHE_TTL = 24 * 3600  # seconds; also capped by the link's own expiry
+MAX_TARGET_LEN = 2040  # Kutt's own limit on target URLs
+_HAS_SCHEME = re.compile(r"^\w+://")
 
 def _short_url_from_payload(d: dict) -> str:
     """
@@ -32,10 +72,8 @@ def _short_url_from_payload(d: dict) -> str:
       3) Fallback: host + address.
     """
     addr = d.get("address")
-    dom = (KUTT_DOMAIN or "").replace("http://", "").replace("https://", "").strip().strip("/")
-    if dom and addr:
-        scheme = "https" if KUTT_HOST.startswith("https://") else "http"
-        return f"{scheme}://{dom}/{addr}"
+    if _KUTT_DISPLAY_PREFIX and addr:
+        return _KUTT_DISPLAY_PREFIX + addr
 
     for k in ("link", "shortUrl"):
         v = d.get(k)
@@ -43,13 +81,136 @@ def _short_url_from_payload(d: dict) -> str:
             return v.strip()
 
     if addr:
-        return f"{_scheme(KUTT_HOST)}://{_netloc(KUTT_HOST)}/{addr}"
+        return _KUTT_HOST_PREFIX + addr
 
     return ""
 
 class KuttCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        # one keep-alive session for every /shorten call; created on first use
+        self._http: aiohttp.ClientSession | None = None
+        self._warmup: asyncio.Task | None = None
+        # set once Kutt has refused KUTT_DOMAIN for this key; later calls don't send it
+        self._domain_forbidden = False
+        # links endpoint that last worked ("/api/v3/links" or "/api/v2/links"); None until learned
+        self._api_version: str | None = None
+        # (url, slug, expire_in_days) -> (short url, monotonic expiry), oldest first
+        self._cache: "OrderedDict[tuple, tuple[str, float]]" = OrderedDict()
+        # cache key -> the POST currently in flight for it
+        self._inflight: dict[tuple, asyncio.Task] = {}
+
+    def _session(self) -> aiohttp.ClientSession:
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                timeout=_KUTT_TIMEOUT,
+                headers=_KUTT_HEADERS,
+                json_serialize=_json_dumps,
+                # every request goes to the same host: keep its connection and DNS answer warm
+                connector=aiohttp.TCPConnector(
+                    resolver=_RESOLVER() if _RESOLVER else None,
+                    limit=32,
+                    limit_per_host=16,
+                    ttl_dns_cache=3600,
+                    keepalive_timeout=75,
+                ),
+            )
+        return self._http
+
+    def _cache_get(self, key: tuple) -> str | None:
+        hit = self._cache.get(key)
+        if hit is None:
+            return None
+        short, expires = hit
+        if time.monotonic() >= expires:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return short
+
+    def _cache_put(self, key: tuple, short: str, expire_in_days: int | None) -> None:
+        ttl = SHORTEN_CACHE_TTL if expire_in_days is None else min(SHORTEN_CACHE_TTL, expire_in_days * 86400)
+        self._cache[key] = (short, time.monotonic() + ttl)
+        self._cache.move_to_end(key)
+        if len(self._cache) > SHORTEN_CACHE_MAX:
+            self._cache.popitem(last=False)
+
+    async def _post(self, endpoint: str, payload: dict) -> tuple[int, dict]:
+        # json= sets Content-Type; auth/accept headers and the timeout live on the shared session
+        async with self._session().post(f"{KUTT_HOST}{endpoint}", json=payload) as r:
+            status = r.status
+            raw = bytearray()
+            async for chunk in r.content.iter_chunked(8192):
+                raw += chunk
+                if len(raw) >= _MAX_BODY:
+                    break
+            try:
+                data = _json_loads(raw)
+            except Exception:
+                data = {"error": raw[:512].decode(errors="replace") or f"HTTP {status}"}
+            return status, data
+
+    async def _post_links(self, payload: dict) -> tuple[int, dict]:
+        # Try the version this instance is known to speak (v3 if unknown), then the other one
+        endpoints = _LINK_ENDPOINTS if self._api_version != _LINK_ENDPOINTS[1] else _LINK_ENDPOINTS[::-1]
+        for endpoint in endpoints:
+            status, data = await self._post(endpoint, payload)
+            if status not in (404, 405):
+                break
+        if 200 <= status < 300:
+            self._api_version = endpoint
+        return status, data
+
+    async def _create_link(self, base_payload: dict) -> tuple[int, dict, bool]:
+        """POST the link to Kutt. Returns (status, data, whether the 'domain' field was sent)."""
+        payload = dict(base_payload)
+        used_domain = False
+        if KUTT_FORCE_DOMAIN and KUTT_DOMAIN and not self._domain_forbidden:
+            payload["domain"] = KUTT_DOMAIN
+            used_domain = True
+
+        status, data = await self._post_links(payload)
+
+        # If domain causes permission issues, retry without it (same version)
+        errmsg = (str(data.get("error", "")) if isinstance(data, dict) else "").lower()
+        if (status < 200 or status >= 300) and used_domain and (
+            "domain" in errmsg or "only users" in errmsg or status in (401, 403)
+        ):
+            status, data = await self._post_links(base_payload)
+            used_domain = False
+            if 200 <= status < 300:
+                # the domain was the problem; stop paying for the doomed first attempt
+                self._domain_forbidden = True
+                log.warning("Kutt rejected domain %r for this API key; sending links without it", KUTT_DOMAIN)
+        return status, data, used_domain
+
+    async def cog_load(self):
+        # resolve the host, open a keep-alive connection and learn the API version now,
+        # not on the first /shorten
+        self._domain_forbidden = False
+        if KUTT_API:
+            self._warmup = asyncio.create_task(self._warm_up())
+
+    async def _warm_up(self) -> None:
+        # listing links is a cheap authenticated GET that only v3 instances answer under /api/v3
+        try:
+            async with self._session().get(f"{KUTT_HOST}/api/v3/links", params={"limit": "1"}) as r:
+                status = r.status
+        except Exception:
+            return  # best effort; /shorten will connect and probe on demand
+        if self._api_version is None:
+            if 200 <= status < 300:
+                self._api_version = _LINK_ENDPOINTS[0]
+            elif status in (404, 405):
+                self._api_version = _LINK_ENDPOINTS[1]
+
+    async def cog_unload(self):
+        if self._warmup is not None:
+            self._warmup.cancel()
+            self._warmup = None
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
 
     @app_commands.command(name="shorten", description="Shorten a URL using your Kutt instance.")
     @app_commands.describe(
@@ -71,11 +232,24 @@ class KuttCog(commands.Cog):
         if not KUTT_API:
             return await inter.followup.send("❌ Kutt API key not configured.", ephemeral=True)
 
-        headers = {
-            "X-API-KEY": KUTT_API,
-            "Accept": "application/json",
-            "Content-Type": "application/json",
-        }
+        # Normalize like Kutt does (bare hosts get http://) and catch obvious junk locally;
+        # anything subtler is still left to Kutt's validator.
+        url = url.strip()
+        if not _HAS_SCHEME.match(url):
+            url = "http://" + url
+        try:
+            netloc = urlparse(url).netloc
+        except ValueError:  # e.g. an unclosed IPv6 bracket
+            netloc = ""
+        if not netloc or len(url) > MAX_TARGET_LEN:
+            return await inter.followup.send("❌ That doesn't look like a valid URL.", ephemeral=True)
+
+        # password-protected links are never reused: each request should get its own
+        cache_key = None if password else (url, slug, expire_in_days)
+        if cache_key is not None:
+            short = self._cache_get(cache_key)
+            if short:
+                return await inter.followup.send(f"🔗Shortened: {short}", ephemeral=False)
 
         base_payload = {"target": url}
         if slug:
@@ -85,53 +259,35 @@ class KuttCog(commands.Cog):
         if expire_in_days is not None:
             base_payload["expireIn"] = int(expire_in_days)
 
-        async def _post(endpoint: str, payload: dict) -> tuple[int, dict]:
-            timeout = aiohttp.ClientTimeout(total=20)
-            async with aiohttp.ClientSession() as session:
-                async with session.post(f"{KUTT_HOST}{endpoint}", json=payload, headers=headers, timeout=timeout) as r:
-                    status = r.status
-                    try:
-                        data = await r.json()
-                    except Exception:
-                        data = {"error": (await r.text()) or f"HTTP {status}"}
-                    return status, data
-
-        payload = dict(base_payload)
-        used_domain = False
-        if KUTT_FORCE_DOMAIN and KUTT_DOMAIN:
-            payload["domain"] = KUTT_DOMAIN
-            used_domain = True
-
-        # Try v3 first, then fallback to v2
-        status, data = await _post("/api/v3/links", payload)
-        if status in (404, 405):
-            status, data = await _post("/api/v2/links", payload)
-
-        # If domain causes permission issues, retry without it (same version)
-        errmsg = (str(data.get("error", "")) if isinstance(data, dict) else "").lower()
-        if (status < 200 or status >= 300) and used_domain and (
-            "domain" in errmsg or "only users" in errmsg or status in (401, 403)
-        ):
-            status, data = await _post("/api/v3/links", base_payload)
-            if status in (404, 405):
-                status, data = await _post("/api/v2/links", base_payload)
-            used_domain = False
+        if cache_key is None:
+            status, data, used_domain = await self._create_link(base_payload)
+        else:
+            # single-flight: concurrent identical requests share one POST
+            task = self._inflight.get(cache_key)
+            if task is None:
+                task = asyncio.ensure_future(self._create_link(base_payload))
+                self._inflight[cache_key] = task
+                task.add_done_callback(lambda _t, k=cache_key: self._inflight.pop(k, None))
+            # shield: one caller going away must not cancel the POST for the others
+            status, data, used_domain = await asyncio.shield(task)
 
         # Success if 2xx OR the payload looks like a link object
-        looks_like_link = isinstance(data, dict) and any(k in data for k in ("address", "id", "link", "shortUrl", "target"))
+        looks_like_link = isinstance(data, dict) and not data.keys().isdisjoint(_LINK_KEYS)
         if (200 <= status < 300) or looks_like_link:
             short = _short_url_from_payload(data if isinstance(data, dict) else {})
             if short:
+                if cache_key is not None:
+                    self._cache_put(cache_key, short, expire_in_days)
                 return await inter.followup.send(f"🔗Shortened: {short}", ephemeral=False)
 
         # Otherwise show a concise error
         hints = []
-        msg = str(data)
-        if status == 401 or "unauthorized" in msg.lower():
+        msg = str(data).lower()
+        if status == 401 or "unauthorized" in msg:
             hints.append("Check your API key.")
-        if "exists" in msg.lower() and slug:
+        if slug and "exists" in msg:
             hints.append("That slug may already be taken.")
-        if used_domain and "domain" in msg.lower():
+        if used_domain and "domain" in msg:
             hints.append("Your key may not be allowed to use that domain.")
         hint_txt = f"  ({' '.join(hints)})" if hints else ""
         await inter.followup.send(f"❌ Error from Kutt: {data}{hint_txt}", ephemeral=True)
@@ -2,26 +2,50 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import json
+import logging
 import os
 import re
 from collections import Counter
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import discord
 from discord import app_commands
-from discord.ext import commands, tasks
+from discord.ext import commands
 from zoneinfo import ZoneInfo
 
-CONFIG_PATH = "data/mc_todo.json"
-os.makedirs(os.path.dirname(CONFIG_PATH), exist_ok=True)
+log = logging.getLogger("utilabot.mc_todo")
+
+# orjson is much faster on the whole-file dump; stdlib json is the fallback
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+# One file per guild, so an edit only rewrites that guild's tasks
+DATA_DIR = "data/mc_todo"
+LEGACY_CONFIG_PATH = "data/mc_todo.json"  # pre-sharding single file; migrated on load
+os.makedirs(DATA_DIR, exist_ok=True)
 
 # ---- Settings / constants ----
 PRIORITY_CHOICES = ("low", "med", "high")
+SAVE_DEBOUNCE_SECONDS = 1.0  # edits within this window are written together
+REFRESH_DEBOUNCE_SECONDS = 2.0  # likewise for panel/topic edits on Discord
+_TAG_SPLIT = re.compile(r"[,\s]+")
+_HHMM = re.compile(r"^\d{1,2}:\d{2}$")
 DEFAULT_TZ = "America/Chicago"
 CENTRAL = ZoneInfo(DEFAULT_TZ)  # CST/CDT auto-handled
 
+def _bump(counter: Counter, key: str, n: int) -> None:
+    """Adjust a count, dropping keys that reach zero so most_common() stays clean."""
+    v = counter[key] + n
+    if v > 0:
+        counter[key] = v
+    else:
+        del counter[key]
+
 # ---- Time helpers ----
 def now_utc() -> datetime:
     return datetime.now(timezone.utc)
@@ -93,10 +117,10 @@ class AddTaskModal(discord.ui.Modal):
             "added_by": interaction.user.id,
             "added_at": iso_utc(now_utc()),
         }
-        g["todo"].append(item)
-        await self.cog._save()
+        self.cog._put_task(g, item, "todo")
+        self.cog._mark_dirty(interaction.guild_id)
         await interaction.response.send_message(f"✅ Added `#{tid}`: {text}", ephemeral=True)
-        await self.cog._refresh_outputs(interaction.guild)
+        self.cog._schedule_refresh(interaction.guild)
 
 
 class DoneTaskModal(discord.ui.Modal):
@@ -119,17 +143,16 @@ class DoneTaskModal(discord.ui.Modal):
             return
 
         g = self.cog._g(interaction.guild_id)
-        t = self.cog._find_task(g, tid, in_done=False)
+        t = self.cog._take_task(g, tid, "todo")
         if not t:
             await interaction.response.send_message("❌ Task not found in To-Do.", ephemeral=True)
             return
-        g["todo"] = [x for x in g["todo"] if int(x["id"]) != tid]
         t["done_by"] = interaction.user.id
         t["done_at"] = iso_utc(now_utc())
-        g["done"].append(t)
-        await self.cog._save()
+        self.cog._put_task(g, t, "done")
+        self.cog._mark_dirty(interaction.guild_id)
         await interaction.response.send_message(f"✅ Completed `#{tid}`.", ephemeral=True)
-        await self.cog._refresh_outputs(interaction.guild)
+        self.cog._schedule_refresh(interaction.guild)
 
 
 class TaskSelect(discord.ui.Select):
@@ -179,20 +202,19 @@ class TaskSelect(discord.ui.Select):
             return
 
         g = self.cog._g(interaction.guild_id)
-        t = self.cog._find_task(g, tid, in_done=False)
+        t = self.cog._take_task(g, tid, "todo")
         if not t:
             await interaction.response.send_message("❌ Task not found in To-Do (maybe already completed).", ephemeral=True)
-            await self.cog._refresh_outputs(interaction.guild)
+            self.cog._schedule_refresh(interaction.guild)
             return
 
-        g["todo"] = [x for x in g["todo"] if int(x["id"]) != tid]
         t["done_by"] = interaction.user.id
         t["done_at"] = iso_utc(now_utc())
-        g["done"].append(t)
-        await self.cog._save()
+        self.cog._put_task(g, t, "done")
+        self.cog._mark_dirty(interaction.guild_id)
 
         await interaction.response.send_message(f"✅ Completed `#{tid}` via dropdown.", ephemeral=True)
-        await self.cog._refresh_outputs(interaction.guild)
+        self.cog._schedule_refresh(interaction.guild)
 
 
 class DoneSelectView(discord.ui.View):
@@ -264,37 +286,134 @@ class MCTodo(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self._lock = asyncio.Lock()
+        self._dirty: Set[str] = set()  # guild ids (as stored) with unsaved edits
+        self._save_task: Optional[asyncio.Task] = None
         self.data: Dict[str, Any] = {"guilds": {}}
         self._load_sync()
 
         # Register a persistent view so button interactions survive restarts.
         self.bot.add_view(PanelView(self, guild_id=None))
 
-        self._ticker.start()
+        # guild id -> timer for its next daily digest; see _reschedule_digest
+        self._digest_handles: Dict[int, asyncio.TimerHandle] = {}
+        # guild id -> pending panel/topic refresh; see _schedule_refresh
+        self._refresh_pending: Dict[int, asyncio.TimerHandle] = {}
+        self._bg_tasks: Set[asyncio.Task] = set()  # digests and refreshes in flight
+
+    async def cog_load(self):
+        for gid, g in self.data["guilds"].items():
+            if g.get("settings", {}).get("digest", {}).get("enabled"):
+                self._reschedule_digest(int(gid))
+
+    async def cog_unload(self):
+        for handle in self._digest_handles.values():
+            handle.cancel()
+        self._digest_handles.clear()
+        for handle in self._refresh_pending.values():
+            handle.cancel()
+        self._refresh_pending.clear()
+        for task in self._bg_tasks:
+            task.cancel()
+        if self._save_task is not None:
+            self._save_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._save_task  # _save lets a write already in its thread finish first
+        # flush whatever the debounce hadn't written yet; the lock orders it after any running save
+        if self._dirty:
+            await self._save()
 
-    def cog_unload(self):
-        if self._ticker.is_running():
-            self._ticker.cancel()
+    @staticmethod
+    def _read_json(path: str) -> Any:
+        with open(path, "rb") as f:
+            raw = f.read()
+        return orjson.loads(raw) if orjson is not None else json.loads(raw)
 
     def _load_sync(self):
-        try:
-            if os.path.exists(CONFIG_PATH):
-                with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-                    self.data = json.load(f)
-            else:
-                self._save_sync()
-        except Exception:
-            self.data = {"guilds": {}}
+        guilds: Dict[str, Any] = {}
+        for name in os.listdir(DATA_DIR):
+            if not name.endswith(".json"):
+                continue
+            try:
+                guilds[name[:-5]] = self._read_json(os.path.join(DATA_DIR, name))
+            except Exception:
+                pass  # a damaged file only loses that guild
+        self.data = {"guilds": guilds}
 
-    def _save_sync(self):
-        tmp = CONFIG_PATH + ".tmp"
-        with open(tmp, "w", encoding="utf-8") as f:
-            json.dump(self.data, f, indent=2, ensure_ascii=False)
-        os.replace(tmp, CONFIG_PATH)
+        # one-time migration from the old single-file store
+        if os.path.exists(LEGACY_CONFIG_PATH):
+            try:
+                legacy = self._read_json(LEGACY_CONFIG_PATH).get("guilds", {})
+            except Exception:
+                legacy = {}
+            moved = {gid for gid in legacy if gid not in guilds}
+            for gid in moved:
+                guilds[gid] = legacy[gid]
+            self._save_sync(moved)
+            os.replace(LEGACY_CONFIG_PATH, LEGACY_CONFIG_PATH + ".migrated")
+
+    def _encode_guilds(self, guild_ids: Optional[Set[str]] = None) -> Dict[str, bytes]:
+        """Serialize the given guilds (all guilds if None). Must run on the event loop, which owns self.data."""
+        guilds = self.data["guilds"]
+        out: Dict[str, bytes] = {}
+        for gid in (list(guilds) if guild_ids is None else guild_ids):
+            g = guilds.get(gid)
+            if g is None:
+                continue
+            g = {k: v for k, v in g.items() if not k.startswith("_")}  # drop runtime-only caches
+            # compact output: the store is machine-read
+            if orjson is not None:
+                out[gid] = orjson.dumps(g, option=orjson.OPT_NON_STR_KEYS)
+            else:
+                out[gid] = json.dumps(g, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return out
+
+    @staticmethod
+    def _write_shards(payloads: Dict[str, bytes]):
+        """Atomically write encoded guild files. Touches no shared state, so it is safe in a thread."""
+        for gid, payload in payloads.items():
+            path = os.path.join(DATA_DIR, f"{gid}.json")
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(payload)
+            os.replace(tmp, path)
+
+    def _save_sync(self, guild_ids: Optional[Set[str]] = None):
+        """Write the given guilds' files (all guilds if None)."""
+        self._write_shards(self._encode_guilds(guild_ids))
 
     async def _save(self):
         async with self._lock:
-            self._save_sync()
+            dirty, self._dirty = self._dirty, set()
+            try:
+                payloads = self._encode_guilds(dirty)
+                # the disk writes and renames don't need the loop; the lock keeps saves in order
+                write = asyncio.ensure_future(asyncio.to_thread(self._write_shards, payloads))
+                try:
+                    await asyncio.shield(write)
+                except asyncio.CancelledError:
+                    # the thread can't be stopped, so hold the lock until its rename is done
+                    await write
+                    raise
+            except BaseException:
+                self._dirty |= dirty  # still unsaved; the next save retries them
+                raise
+
+    def _mark_dirty(self, guild_id: int):
+        """Schedule a save of this guild; bursts of edits within SAVE_DEBOUNCE_SECONDS share one write."""
+        self._dirty.add(str(guild_id))
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.create_task(self._debounced_save())
+
+    async def _debounced_save(self):
+        # loop: edits made while a save is running get their own write
+        while self._dirty:
+            await asyncio.sleep(SAVE_DEBOUNCE_SECONDS)
+            try:
+                await self._save()
+            except Exception:
+                # guilds stay dirty; the next edit schedules another attempt
+                log.exception("Failed to save MC to-do data for guilds %s", sorted(self._dirty))
+                return
 
     # =========================
     # Data helpers
@@ -322,7 +441,7 @@ class MCTodo(commands.Cog):
                 "done": [],
             }
             self.data["guilds"][gid] = g
-            self._save_sync()
+            self._mark_dirty(guild_id)
         return g
 
     def _next_id(self, g: Dict[str, Any]) -> int:
@@ -332,7 +451,7 @@ class MCTodo(commands.Cog):
     def _parse_tags(self, tags: Optional[str]) -> List[str]:
         if not tags:
             return []
-        parts = re.split(r"[,\s]+", tags.strip())
+        parts = _TAG_SPLIT.split(tags.strip())
         cleaned = []
         for p in parts:
             if not p:
@@ -378,7 +497,7 @@ class MCTodo(commands.Cog):
         todo = gdata["todo"]
         done = gdata["done"]
 
-        pr_counter = Counter(t.get("priority", "low") for t in todo)
+        pr_counter, tag_counter = self._counts(gdata)
         pr_str = " | ".join(f"{k}:{pr_counter.get(k,0)}" for k in ("high", "med", "low"))
 
         newest = todo[-3:] if len(todo) > 3 else todo
@@ -387,7 +506,6 @@ class MCTodo(commands.Cog):
         recent = done[-3:] if len(done) > 3 else done
         recent_lines = [self._fmt_task_line(t) for t in recent] if recent else ["*(none yet)*"]
 
-        tag_counter = Counter(tag for t in (todo + done) for tag in t.get("tags", []))
         top_tags = ", ".join([f"{tag}({cnt})" for tag, cnt in tag_counter.most_common(5)]) if tag_counter else "—"
 
         embed = discord.Embed(
@@ -440,15 +558,22 @@ class MCTodo(commands.Cog):
         channel = guild.get_channel(int(ch_id))
         if not isinstance(channel, (discord.TextChannel, discord.Thread)):
             return
+
+        # skip the fetch + edit when the panel would come out the same as last time
+        embed = self._make_panel_embed(guild, g)
+        sig = hash((msg_id, embed.description, tuple(f.value for f in embed.fields)))
+        if g.get("_panel_sig") == sig:
+            return
         try:
             msg = await channel.fetch_message(int(msg_id))
         except Exception:
             s["panel_message_id"] = None
-            await self._save()
+            self._mark_dirty(guild.id)
             return
 
         try:
-            await msg.edit(embed=self._make_panel_embed(guild, g), view=self._panel_view(guild))
+            await msg.edit(embed=embed, view=self._panel_view(guild))
+            g["_panel_sig"] = sig  # runtime-only, like the other "_" keys
         except (discord.Forbidden, discord.HTTPException):
             pass
 
@@ -465,15 +590,18 @@ class MCTodo(commands.Cog):
             return
 
         todo = g.get("todo", [])
-        pr_counter = Counter(t.get("priority", "low") for t in todo)
-        tag_counter = Counter(tag for t in (todo + g.get("done", [])) for tag in t.get("tags", []))
+        pr_counter, tag_counter = self._counts(g)
         top_tags = ",".join([tag for tag, _ in tag_counter.most_common(3)]) if tag_counter else ""
         topic = f"Tasks left: {len(todo)} | High:{pr_counter.get('high',0)} Med:{pr_counter.get('med',0)} Low:{pr_counter.get('low',0)}"
         if top_tags:
             topic += f" | {top_tags}"
+        topic = topic[:1024]
+        if g.get("_topic_sig") == (channel.id, topic):
+            return  # unchanged; channel edits are heavily rate-limited
 
         try:
-            await channel.edit(topic=topic[:1024])
+            await channel.edit(topic=topic)
+            g["_topic_sig"] = (channel.id, topic)
         except (discord.Forbidden, discord.HTTPException):
             pass
 
@@ -481,67 +609,103 @@ class MCTodo(commands.Cog):
         await self._refresh_panel(guild)
         await self._refresh_channeltopic(guild)
 
+    def _schedule_refresh(self, guild: Optional[discord.Guild]):
+        """Refresh panel/topic after REFRESH_DEBOUNCE_SECONDS; edits in the meantime share that one refresh."""
+        if guild is None or guild.id in self._refresh_pending:
+            return
+        loop = asyncio.get_running_loop()
+        self._refresh_pending[guild.id] = loop.call_later(REFRESH_DEBOUNCE_SECONDS, self._refresh_due, guild)
+
+    def _refresh_due(self, guild: discord.Guild):
+        self._refresh_pending.pop(guild.id, None)
+        task = asyncio.create_task(self._refresh_outputs(guild))
+        self._bg_tasks.add(task)
+        task.add_done_callback(self._bg_tasks.discard)
+
     # =========================
-    # Background ticker (digest)
+    # Daily digest (one timer per enabled guild)
     # =========================
-    @tasks.loop(minutes=1)
-    async def _ticker(self):
-        await self.bot.wait_until_ready()
-        utc_now = now_utc()
-
-        for guild in list(self.bot.guilds):
-            g = self._g(guild.id)
-            d = g["settings"]["digest"]
-            if not d.get("enabled"):
-                continue
+    def _digest_tz(self, d: Dict[str, Any]) -> ZoneInfo:
+        try:
+            return ZoneInfo(d.get("tz") or DEFAULT_TZ)
+        except Exception:
+            return CENTRAL  # fallback
+
+    def _reschedule_digest(self, guild_id: int):
+        """Arm a one-shot timer for this guild's next digest (or drop it if digests are off)."""
+        handle = self._digest_handles.pop(guild_id, None)
+        if handle is not None:
+            handle.cancel()
+        d = self._g(guild_id)["settings"]["digest"]
+        if not d.get("enabled"):
+            return
 
-            tzname = d.get("tz") or DEFAULT_TZ
-            try:
-                tz = ZoneInfo(tzname)
-            except Exception:
-                tz = CENTRAL  # fallback
-            local_now = utc_now.astimezone(tz)
-            if local_now.hour != int(d.get("time_h", 9)) or local_now.minute != int(d.get("time_m", 0)):
-                continue
+        utc_now = now_utc()
+        local_now = utc_now.astimezone(self._digest_tz(d))
+        target = local_now.replace(hour=int(d.get("time_h", 9)), minute=int(d.get("time_m", 0)), second=0, microsecond=0)
+        if target <= local_now:
+            target += timedelta(days=1)
+        # compare in UTC so a DST change before the target is accounted for
+        delay = (target.astimezone(timezone.utc) - utc_now).total_seconds()
+        loop = asyncio.get_running_loop()
+        self._digest_handles[guild_id] = loop.call_at(loop.time() + delay, self._digest_due, guild_id)
+
+    def _digest_due(self, guild_id: int):
+        # re-arm for the next occurrence first; a timer that fired a hair early lands on today again
+        self._reschedule_digest(guild_id)
+        task = asyncio.create_task(self._send_digest(guild_id))
+        self._bg_tasks.add(task)
+        task.add_done_callback(self._bg_tasks.discard)
+
+    async def _send_digest(self, guild_id: int):
+        await self.bot.wait_until_ready()
+        guild = self.bot.get_guild(guild_id)
+        if guild is None:
+            return
+        g = self._g(guild.id)
+        d = g["settings"]["digest"]
+        if not d.get("enabled"):
+            return
 
-            today_str = local_now.strftime("%Y-%m-%d")
-            if d.get("last_sent_date") == today_str:
-                continue  # already sent today
+        utc_now = now_utc()
+        local_now = utc_now.astimezone(self._digest_tz(d))
+        if (local_now.hour, local_now.minute) < (int(d.get("time_h", 9)), int(d.get("time_m", 0))):
+            return  # woke early; the re-armed timer covers it
 
-            ch_id = d.get("channel_id") or g["settings"].get("panel_channel_id")
-            if not ch_id:
-                continue
-            channel = guild.get_channel(int(ch_id))
-            if not isinstance(channel, (discord.TextChannel, discord.Thread)):
-                continue
+        today_str = local_now.strftime("%Y-%m-%d")
+        if d.get("last_sent_date") == today_str:
+            return  # already sent today
 
-            todo = g.get("todo", [])
-            pr_counter = Counter(t.get("priority", "low") for t in todo)
-            embed = discord.Embed(
-                title="🗞️ Daily Minecraft To-Do Digest",
-                description=(
-                    f"You have **{len(todo)}** tasks.\n"
-                    f"High: {pr_counter.get('high',0)} • Med: {pr_counter.get('med',0)} • Low: {pr_counter.get('low',0)}"
-                ),
-                color=discord.Color.green(),
-                timestamp=utc_now,
-            )
-            recent = todo[-5:] if len(todo) > 5 else todo
-            lines = [self._fmt_task_line(t) for t in recent] if recent else ["*(no tasks yet)*"]
-            embed.add_field(name="Recent Tasks", value="\n".join(lines), inline=False)
+        ch_id = d.get("channel_id") or g["settings"].get("panel_channel_id")
+        if not ch_id:
+            return
+        channel = guild.get_channel(int(ch_id))
+        if not isinstance(channel, (discord.TextChannel, discord.Thread)):
+            return
 
-            try:
-                await channel.send(embed=embed)
-                d["last_sent_date"] = today_str
-                await self._save()
-            except (discord.Forbidden, discord.HTTPException):
-                pass
+        todo = g.get("todo", [])
+        pr_counter, _ = self._counts(g)
+        embed = discord.Embed(
+            title="🗞️ Daily Minecraft To-Do Digest",
+            description=(
+                f"You have **{len(todo)}** tasks.\n"
+                f"High: {pr_counter.get('high',0)} • Med: {pr_counter.get('med',0)} • Low: {pr_counter.get('low',0)}"
+            ),
+            color=discord.Color.green(),
+            timestamp=utc_now,
+        )
+        recent = todo[-5:] if len(todo) > 5 else todo
+        lines = [self._fmt_task_line(t) for t in recent] if recent else ["*(no tasks yet)*"]
+        embed.add_field(name="Recent Tasks", value="\n".join(lines), inline=False)
 
-            await self._refresh_outputs(guild)
+        try:
+            await channel.send(embed=embed)
+            d["last_sent_date"] = today_str
+            self._mark_dirty(guild.id)
+        except (discord.Forbidden, discord.HTTPException):
+            pass
 
-    @_ticker.before_loop
-    async def _before_ticker(self):
-        await self.bot.wait_until_ready()
+        await self._refresh_outputs(guild)
 
     # =========================
     # Slash commands
@@ -574,10 +738,10 @@ class MCTodo(commands.Cog):
             "added_by": interaction.user.id,
             "added_at": iso_utc(now_utc()),
         }
-        g["todo"].append(item)
-        await self._save()
+        self._put_task(g, item, "todo")
+        self._mark_dirty(interaction.guild_id)
         await interaction.followup.send(f"✅ Added `#{tid}`: {text}", ephemeral=True)
-        await self._refresh_outputs(interaction.guild)
+        self._schedule_refresh(interaction.guild)
 
     # ---- list ----
     @mctodo.command(name="list", description="List tasks.")
@@ -634,17 +798,16 @@ class MCTodo(commands.Cog):
     async def mark_done(self, interaction: discord.Interaction, id: int):
         await interaction.response.defer(ephemeral=True)
         g = self._g(interaction.guild_id)
-        t = self._find_task(g, id, in_done=False)
+        t = self._take_task(g, id, "todo")
         if not t:
             await interaction.followup.send("❌ Task not found in To-Do.", ephemeral=True)
             return
-        g["todo"] = [x for x in g["todo"] if int(x["id"]) != int(id)]
         t["done_by"] = interaction.user.id
         t["done_at"] = iso_utc(now_utc())
-        g["done"].append(t)
-        await self._save()
+        self._put_task(g, t, "done")
+        self._mark_dirty(interaction.guild_id)
         await interaction.followup.send(f"✅ Completed `#{id}`.", ephemeral=True)
-        await self._refresh_outputs(interaction.guild)
+        self._schedule_refresh(interaction.guild)
 
     # ---- undo ----
     @mctodo.command(name="undo", description="Move a completed task back to To-Do.")
@@ -652,17 +815,16 @@ class MCTodo(commands.Cog):
     async def undo(self, interaction: discord.Interaction, id: int):
         await interaction.response.defer(ephemeral=True)
         g = self._g(interaction.guild_id)
-        t = self._find_task(g, id, in_done=True)
+        t = self._take_task(g, id, "done")
         if not t:
             await interaction.followup.send("❌ Task not found in Completed.", ephemeral=True)
             return
-        g["done"] = [x for x in g["done"] if int(x["id"]) != int(id)]
         t.pop("done_by", None)
         t.pop("done_at", None)
-        g["todo"].append(t)
-        await self._save()
+        self._put_task(g, t, "todo")
+        self._mark_dirty(interaction.guild_id)
         await interaction.followup.send(f"↩️ Moved `#{id}` back to To-Do.", ephemeral=True)
-        await self._refresh_outputs(interaction.guild)
+        self._schedule_refresh(interaction.guild)
 
     # ---- remove ----
     @mctodo.command(name="remove", description="Delete a task entirely.")
@@ -670,16 +832,12 @@ class MCTodo(commands.Cog):
     async def remove(self, interaction: discord.Interaction, id: int):
         await interaction.response.defer(ephemeral=True)
         g = self._g(interaction.guild_id)
-        before = len(g["todo"]) + len(g["done"])
-        g["todo"] = [x for x in g["todo"] if int(x["id"]) != int(id)]
-        g["done"] = [x for x in g["done"] if int(x["id"]) != int(id)]
-        after = len(g["todo"]) + len(g["done"])
-        if before == after:
+        if not (self._take_task(g, id, "todo") or self._take_task(g, id, "done")):
             await interaction.followup.send("❌ Task not found.", ephemeral=True)
             return
-        await self._save()
+        self._mark_dirty(interaction.guild_id)
         await interaction.followup.send(f"🗑️ Removed `#{id}`.", ephemeral=True)
-        await self._refresh_outputs(interaction.guild)
+        self._schedule_refresh(interaction.guild)
 
     # ---- clear ----
     @mctodo.command(name="clear", description="Clear tasks in a section.")
@@ -702,11 +860,14 @@ class MCTodo(commands.Cog):
         sec = section.value
         if sec in ("todo", "all"):
             g["todo"] = []
+            self._task_index(g, "todo").clear()
         if sec in ("done", "all"):
             g["done"] = []
-        await self._save()
+            self._task_index(g, "done").clear()
+        g.pop("_counts", None)  # recounted from what's left on next read
+        self._mark_dirty(interaction.guild_id)
         await interaction.followup.send(f"🧹 Cleared **{sec}**.", ephemeral=True)
-        await self._refresh_outputs(interaction.guild)
+        self._schedule_refresh(interaction.guild)
 
     # ---- stats ----
     @mctodo.command(name="stats", description="Show quick stats.")
@@ -715,8 +876,7 @@ class MCTodo(commands.Cog):
         todo = g["todo"]
         done = g["done"]
 
-        pr_counter = Counter(t.get("priority", "low") for t in todo)
-        tag_counter = Counter(tag for t in (todo + done) for tag in t.get("tags", []))
+        pr_counter, tag_counter = self._counts(g)
 
         embed = discord.Embed(title="📊 To-Do Stats", color=discord.Color.gold())
         embed.add_field(
@@ -768,7 +928,7 @@ class MCTodo(commands.Cog):
         msg = await ch.send(embed=embed, view=self._panel_view(interaction.guild))
         s["panel_channel_id"] = msg.channel.id
         s["panel_message_id"] = msg.id
-        await self._save()
+        self._mark_dirty(interaction.guild_id)
         await interaction.followup.send("📌 Panel set. Buttons added. I’ll keep this message updated.", ephemeral=True)
 
     @mctodo.command(name="panel_clear", description="Unbind (and delete) the current To-Do summary panel.")
@@ -789,7 +949,7 @@ class MCTodo(commands.Cog):
                 pass
         s["panel_channel_id"] = None
         s["panel_message_id"] = None
-        await self._save()
+        self._mark_dirty(interaction.guild_id)
         await interaction.followup.send("🗑️ Panel cleared.", ephemeral=True)
 
     # ---- channel topic toggle ----
@@ -806,9 +966,9 @@ class MCTodo(commands.Cog):
         await interaction.response.defer(ephemeral=True)
         g = self._g(interaction.guild_id)
         g["settings"]["channeltopic_enabled"] = (state.value == "on")
-        await self._save()
+        self._mark_dirty(interaction.guild_id)
         await interaction.followup.send(f"📝 Channel topic updates: **{state.value}**.", ephemeral=True)
-        await self._refresh_outputs(interaction.guild)
+        self._schedule_refresh(interaction.guild)
 
     # ---- digest set/off ----
     @mctodo.command(name="digest", description="Set or turn off the daily digest.")
@@ -838,11 +998,12 @@ class MCTodo(commands.Cog):
 
         if action.value == "off":
             d["enabled"] = False
-            await self._save()
+            self._mark_dirty(interaction.guild_id)
+            self._reschedule_digest(interaction.guild_id)
             await interaction.followup.send("🔕 Daily digest disabled.", ephemeral=True)
             return
 
-        if not time or not re.match(r"^\d{1,2}:\d{2}$", time.strip()):
+        if not time or not _HHMM.match(time.strip()):
             await interaction.followup.send("❌ Provide time as `HH:MM` (24h). Example: `09:00`", ephemeral=True)
             return
         hh, mm = time.split(":")
@@ -878,21 +1039,57 @@ class MCTodo(commands.Cog):
             "tz": tzname,
             "last_sent_date": None,
         })
-        await self._save()
+        self._mark_dirty(interaction.guild_id)
+        self._reschedule_digest(interaction.guild_id)
         await interaction.followup.send(
             f"🗓️ Daily digest set for **{hh:02}:{mm:02} {tzname}** in <#{ch_id}>.",
             ephemeral=True,
         )
 
     # =========================
-    # Internal find helper
+    # Internal task index helpers
     # =========================
-    def _find_task(self, g: Dict[str, Any], tid: int, in_done: bool = False) -> Optional[Dict[str, Any]]:
-        arr = g["done"] if in_done else g["todo"]
-        for t in arr:
-            if int(t.get("id")) == int(tid):
-                return t
-        return None
+    def _task_index(self, g: Dict[str, Any], section: str) -> Dict[int, Dict[str, Any]]:
+        """id -> task for one section ("todo"/"done"). Runtime-only: built on first use, never saved."""
+        idx = g.get("_index")
+        if idx is None:
+            idx = g["_index"] = {
+                sec: {int(t["id"]): t for t in g[sec]} for sec in ("todo", "done")
+            }
+        return idx[section]
+
+    def _counts(self, g: Dict[str, Any]) -> Tuple[Counter, Counter]:
+        """(To-Do priority counts, tag counts over both sections). Runtime-only, kept current by put/take."""
+        c = g.get("_counts")
+        if c is None:
+            c = g["_counts"] = (
+                Counter(t.get("priority", "low") for t in g["todo"]),
+                Counter(tag for sec in ("todo", "done") for t in g[sec] for tag in t.get("tags", [])),
+            )
+        return c
+
+    def _count_task(self, g: Dict[str, Any], t: Dict[str, Any], section: str, n: int) -> None:
+        c = g.get("_counts")
+        if c is None:
+            return  # not built yet; the first read counts from the lists
+        pr_counter, tag_counter = c
+        if section == "todo":
+            _bump(pr_counter, t.get("priority", "low"), n)
+        for tag in t.get("tags", []):
+            _bump(tag_counter, tag, n)
+
+    def _put_task(self, g: Dict[str, Any], t: Dict[str, Any], section: str) -> None:
+        g[section].append(t)
+        self._task_index(g, section)[int(t["id"])] = t
+        self._count_task(g, t, section, 1)
+
+    def _take_task(self, g: Dict[str, Any], tid: int, section: str) -> Optional[Dict[str, Any]]:
+        """Remove a task from a section and return it (None if it isn't there)."""
+        t = self._task_index(g, section).pop(int(tid), None)
+        if t is not None:
+            g[section].remove(t)  # still an O(N) scan of the display list, but C-level and int()-free
+            self._count_task(g, t, section, -1)
+        return t
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(MCTodo(bot))
@@ -26,8 +26,11 @@ Usage in a cog:
 If you want a dedicated "house" account, reserve user_id=0 (or any constant).
 """
 from contextlib import contextmanager
+from operator import attrgetter
 from typing import Callable, Optional, Tuple
 
+from sqlalchemy import update
+
 from utils.db import Balance  # type: ignore
 from utils.common import ensure_user  # type: ignore
 
@@ -39,23 +42,37 @@ from utils.common import ensure_user  # type: ignore
 _BALANCE_FIELDS = ("amount", "balance", "credits", "coins", "value")
 
 
-def _detect_field(bal: Balance) -> Optional[str]:
+def _detect_field() -> Optional[str]:
+    # Inspect the mapped columns once on the class instead of hasattr() on every row.
+    columns = Balance.__mapper__.columns
     for f in _BALANCE_FIELDS:
-        if hasattr(bal, f):
+        if f in columns:
             return f
     return None
 
 
+def _make_setter(field: str) -> Callable[[Balance, int], None]:
+    def _set(bal: Balance, value: int) -> None:
+        setattr(bal, field, value)
+    return _set
+
+
+# Specialized accessors, built once the field is known.
+_BAL_FIELD: Optional[str] = _detect_field()
+_BAL_GETTER: Optional[Callable[[Balance], object]] = attrgetter(_BAL_FIELD) if _BAL_FIELD else None
+_BAL_SETTER: Optional[Callable[[Balance, int], None]] = _make_setter(_BAL_FIELD) if _BAL_FIELD else None
+_BAL_COL = getattr(Balance, _BAL_FIELD) if _BAL_FIELD else None
+
+
 def _ensure_balance_row(session, user_id: int) -> Tuple[Balance, str]:
+    if not _BAL_FIELD:
+        raise RuntimeError("Could not detect numeric balance column on Balance model.")
     bal = session.query(Balance).filter_by(user_id=user_id).one_or_none()
     if not bal:
         bal = Balance(user_id=user_id)
         session.add(bal)
         session.flush()
-    field = _detect_field(bal)
-    if not field:
-        raise RuntimeError("Could not detect numeric balance column on Balance model.")
-    return bal, field
+    return bal, _BAL_FIELD
 
 
 # ----------------------------
@@ -81,23 +98,40 @@ def with_session(SessionLocal: Callable[[], object]):
 # ----------------------------
 
 def get_balance(session, user_id: int) -> int:
-    bal, field = _ensure_balance_row(session, user_id)
-    return int(getattr(bal, field) or 0)
+    bal, _field = _ensure_balance_row(session, user_id)
+    return int(_BAL_GETTER(bal) or 0)
 
 
 def set_balance(session, user_id: int, new_amount: int) -> int:
-    bal, field = _ensure_balance_row(session, user_id)
-    setattr(bal, field, int(new_amount))
+    bal, _field = _ensure_balance_row(session, user_id)
+    _BAL_SETTER(bal, int(new_amount))
     session.flush()
-    return int(getattr(bal, field) or 0)
+    return int(_BAL_GETTER(bal) or 0)
 
 
 def add_balance(session, user_id: int, delta: int) -> int:
-    bal, field = _ensure_balance_row(session, user_id)
-    current = int(getattr(bal, field) or 0)
-    setattr(bal, field, current + int(delta))
+    # Fast path: one in-place UPDATE (RETURNING the new value where the DB supports it)
+    # instead of SELECT + UPDATE. In-session Balance objects are kept in sync by the ORM.
+    if _BAL_FIELD:
+        col = _BAL_COL
+        # a NULL balance would stay NULL under col + delta; leave it to the fallback below
+        stmt = (
+            update(Balance)
+            .where(Balance.user_id == user_id, col.isnot(None))
+            .values({_BAL_FIELD: col + int(delta)})
+        )
+        if session.get_bind().dialect.update_returning:
+            new = session.execute(stmt.returning(col)).scalar_one_or_none()
+            if new is not None:
+                return int(new)
+        elif session.execute(stmt).rowcount:
+            return get_balance(session, user_id)
+    # No row yet (or a NULL balance): go through the ORM read-modify-write path.
+    bal, _field = _ensure_balance_row(session, user_id)
+    current = int(_BAL_GETTER(bal) or 0)
+    _BAL_SETTER(bal, current + int(delta))
     session.flush()
-    return int(getattr(bal, field) or 0)
+    return int(_BAL_GETTER(bal) or 0)
 
 
 def can_afford(session, user_id: int, amount: int) -> bool: